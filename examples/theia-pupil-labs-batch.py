@@ -12,11 +12,21 @@ Usage:
     python test_batch_api_compiled.py
 """
 
+import functools
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
 import sys
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, TextIO
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
 import harmoneyes_theia
@@ -25,12 +35,42 @@ PROJECT_ROOT = Path(__file__).parent
 DATA_PATH = PROJECT_ROOT / "gaze_and_eye_state.csv"
 SCENE_CAMERA_JSON = "scene_camera.json"
 
+# Column dtypes for a Neon Cloud gaze_and_eye_state.csv export, so the gaze
+# measurements come out as float32 rather than float64. The C parser converts
+# straight to these types; the pyarrow engine still infers each column and then
+# casts to them, at the cost of one extra copy.
+# Entries for columns that a given export does not contain are ignored.
+GAZE_SCHEMA = {
+    "timestamp [ns]": "int64",
+    "gaze x [px]": "float32",
+    "gaze y [px]": "float32",
+    **{f"pupil diameter {side} [mm]": "float32" for side in ("left", "right")},
+    **{
+        f"{name} {side} {axis}{unit}": "float32"
+        for name, unit in (("eyeball center", " [mm]"), ("optical axis", ""))
+        for side in ("left", "right")
+        for axis in "xyz"
+    },
+    **{
+        f"eyelid angle {lid} {side} [rad]": "float32"
+        for lid in ("top", "bottom")
+        for side in ("left", "right")
+    },
+    **{f"eyelid aperture {side} [mm]": "float32" for side in ("left", "right")},
+}
+
+# CPU cores for each predict_*_batch call. Two examples run at a time (see
+# main()), so each gets half of the machine rather than a fixed count.
+N_JOBS = max(1, (os.cpu_count() or 4) // 2)
+
+# pyarrow's multithreaded CSV reader is much faster on a file this size, but it
+# is optional — fall back to pandas' default C parser when it is not installed.
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
 
 def _create_sdk() -> harmoneyes_theia.TheiaSDK:
     """Create and return a configured TheiaSDK instance.
     """
-    import os
-
     license_key = "your-license-key-here"
 
     return harmoneyes_theia.TheiaSDK(
@@ -39,14 +79,67 @@ def _create_sdk() -> harmoneyes_theia.TheiaSDK:
     )
 
 
-def _print_header(title: str) -> None:
-    print("\n" + "=" * 70)
-    print(title)
-    print("=" * 70)
+@functools.lru_cache(maxsize=4)
+def _read_gaze_csv(path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """Parse a gaze CSV once per (path, mtime, size) and reuse it afterwards.
+
+    The modification time and size are part of the cache key so an edited
+    file is picked up again instead of serving a stale DataFrame.
+    """
+    df = pd.read_csv(path, engine=CSV_ENGINE, dtype=GAZE_SCHEMA)
+
+    # Narrow the measurement columns the schema did not cover (e.g. azimuth
+    # and elevation, the worn flag) so they reach the SDK as float32 and small
+    # integers. Identifiers (fixation id, blink id, ...) are left as parsed,
+    # and timestamps keep full int64 nanosecond precision.
+    measurements = [c for c in df.columns if c != "timestamp [ns]" and not c.endswith(" id")]
+    floats = df[measurements].select_dtypes("float64").columns
+    df[floats] = df[floats].astype("float32")
+    ints = df[measurements].select_dtypes("int64").columns
+    df[ints] = df[ints].apply(pd.to_numeric, downcast="integer")
+    return df
+
+
+@functools.lru_cache(maxsize=None)
+def _load_scene_camera(path: str) -> dict:
+    """Parse a scene camera calibration file once and share the dict.
+
+    ``scene_camera_json`` accepts a dict with a ``camera_matrix`` key as well
+    as a path; the SDK only reads it, so every example can use the same one.
+    """
+    with open(path) as f:
+        return json.load(f)
+
 
+_gaze_df_lock = threading.Lock()
+
+
+def _load_gaze_df(path: Path) -> pd.DataFrame:
+    """Return the parsed gaze data for ``path``, shared across the examples."""
+    st = path.stat()
+    # The examples run concurrently; serialize so only the first one parses
+    with _gaze_df_lock:
+        return _read_gaze_csv(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _check_range(name: str, values: np.ndarray, low: float, high: float, out: TextIO) -> bool:
+    """Check that every entry of ``values`` lies in [low, high], reporting the first miss."""
+    bad = np.flatnonzero(~((values >= low) & (values <= high)))
+    if bad.size:
+        i = bad[0]
+        print(f"  ERROR: {name}={values[i]} at index {i} out of expected range {low}-{high}", file=out)
+        return False
+    return True
 
-def test_predict_cog_load_batch() -> bool:
-    """Predict cognitive load from a CSV file path.
+
+def _print_header(title: str, out: TextIO | None = None) -> None:
+    print("\n" + "=" * 70, file=out)
+    print(title, file=out)
+    print("=" * 70, file=out)
+
+
+def test_predict_cog_load_batch(sdk: harmoneyes_theia.TheiaSDK, out: TextIO) -> bool:
+    """Predict cognitive load from the full recording.
 
     Loads ~20 minutes of 200 Hz gaze data (240,000 rows) and runs batch
     cognitive load prediction. Results contain per-second predictions after
@@ -58,73 +151,71 @@ def test_predict_cog_load_batch() -> bool:
         - label (str):       human-readable cognitive load level
         - confidence (float): model confidence in [0.0, 1.0]
     """
-    _print_header("Test 1: Cognitive Load Batch Prediction (CSV path)")
-
-    sdk = _create_sdk()
-    print("SDK initialized")
+    _print_header("Test 1: Cognitive Load Batch Prediction (full recording)", out)
 
     if not DATA_PATH.exists():
-        print(f"ERROR: Data file not found: {DATA_PATH}")
+        print(f"ERROR: Data file not found: {DATA_PATH}", file=out)
         return False
 
-    print(f"Using data: {DATA_PATH.name} (240,000 rows = 20 min at 200 Hz)")
+    print(f"Using data: {DATA_PATH.name} (240,000 rows = 20 min at 200 Hz)", file=out)
 
     try:
-        print("\nRunning predict_cog_load_batch()...")
-        print("  This may take a minute to process 20 minutes of data.")
+        print("\nRunning predict_cog_load_batch()...", file=out)
 
         results = sdk.predict_cog_load_batch(
-            data=str(DATA_PATH),
-            n_jobs=4,
-            scene_camera_json=SCENE_CAMERA_JSON,
+            data=_load_gaze_df(DATA_PATH),
+            n_jobs=N_JOBS,
+            scene_camera_json=_load_scene_camera(SCENE_CAMERA_JSON),
         )
 
-        print(f"\nPredictions returned: {len(results)}")
-        print("  Expected: ~1180 (1200 seconds - 20 second warmup)")
+        print(f"\nPredictions returned: {len(results)}", file=out)
+        print("  Expected: ~1180 (1200 seconds - 20 second warmup)", file=out)
 
         if len(results) == 0:
-            print("  ERROR: No results returned")
+            print("  ERROR: No results returned", file=out)
             return False
 
         # Validate result structure
         first = results[0]
         required_keys = {"timestamp", "value", "label", "confidence"}
         if not required_keys.issubset(first.keys()):
-            print(f"  ERROR: Missing keys. Expected {required_keys}, got {set(first.keys())}")
+            print(f"  ERROR: Missing keys. Expected {required_keys}, got {set(first.keys())}", file=out)
             return False
 
-        # Validate value ranges
-        if not (0 <= first["value"] <= 2):
-            print(f"  ERROR: value={first['value']} out of expected range 0-2")
+        # Validate value ranges across every prediction, using the
+        # one-array-per-field form that suits analysis of long recordings
+        n = len(results)
+        columns = harmoneyes_theia.batch_results_to_arrays(results)
+        timestamps, labels, confs = columns["timestamp"], columns["label"], columns["confidence"]
+        if not _check_range("value", columns["value"], 0, 2, out):
             return False
-        if not (0.0 <= first["confidence"] <= 1.0):
-            print(f"  ERROR: confidence={first['confidence']} out of expected range 0.0-1.0")
+        if not _check_range("confidence", confs, 0.0, 1.0, out):
             return False
 
         # Display first result
-        print(f"\n  First result:")
-        print(f"    timestamp:  {first['timestamp']}")
-        print(f"    label:      {first['label']}")
-        print(f"    value:      {first['value']}")
-        print(f"    confidence: {first['confidence']:.3f}")
+        print(f"\n  First result:", file=out)
+        print(f"    timestamp:  {first['timestamp']}", file=out)
+        print(f"    label:      {first['label']}", file=out)
+        print(f"    value:      {first['value']}", file=out)
+        print(f"    confidence: {first['confidence']:.3f}", file=out)
 
         # Sample predictions across the full recording
-        print("\n  Sample predictions (evenly spaced):")
-        for i in [0, len(results) // 4, len(results) // 2, -1]:
-            r = results[i]
-            print(f"    t={r['timestamp']:6.1f}s  label={r['label']}  conf={r['confidence']:.3f}")
+        print(f"\n  Mean confidence: {confs.mean():.3f}", file=out)
+        print("\n  Sample predictions (evenly spaced):", file=out)
+        for i in [0, n // 4, n // 2, -1]:
+            print(f"    t={timestamps[i]:6.1f}s  label={labels[i]}  conf={confs[i]:.3f}", file=out)
 
-        print("\nPASSED: predict_cog_load_batch()")
+        print("\nPASSED: predict_cog_load_batch()", file=out)
         return True
 
     except Exception as e:
-        print(f"\nFAILED: {e}")
+        print(f"\nFAILED: {e}", file=out)
         traceback.print_exc()
         return False
 
 
-def test_predict_drowsiness_batch() -> bool:
-    """Predict drowsiness from a CSV file path.
+def test_predict_drowsiness_batch(sdk: harmoneyes_theia.TheiaSDK, out: TextIO) -> bool:
+    """Predict drowsiness from the full recording.
 
     Uses a prediction_stride of 120 seconds so predictions are generated
     every 2 minutes instead of every second. A timezone is required for
@@ -136,122 +227,156 @@ def test_predict_drowsiness_batch() -> bool:
         - label (str):       human-readable drowsiness level
         - confidence (float): model confidence in [0.0, 1.0]
     """
-    _print_header("Test 2: Drowsiness Batch Prediction (CSV path)")
-
-    sdk = _create_sdk()
-    print("SDK initialized")
+    _print_header("Test 2: Drowsiness Batch Prediction (full recording)", out)
 
     if not DATA_PATH.exists():
-        print(f"ERROR: Data file not found: {DATA_PATH}")
+        print(f"ERROR: Data file not found: {DATA_PATH}", file=out)
         return False
 
-    print(f"Using data: {DATA_PATH.name}")
+    print(f"Using data: {DATA_PATH.name}", file=out)
 
     try:
         # Timezone is required — the drowsiness model uses time-of-day as a feature
         tz = ZoneInfo("America/New_York")
 
-        print("\nRunning predict_drowsiness_batch()...")
-        print("  prediction_stride=120  (one prediction every 2 minutes)")
-        print(f"  timezone={tz}")
+        print("\nRunning predict_drowsiness_batch()...", file=out)
+        print("  prediction_stride=120  (one prediction every 2 minutes)", file=out)
+        print(f"  timezone={tz}", file=out)
 
         results = sdk.predict_drowsiness_batch(
-            data=str(DATA_PATH),
+            data=_load_gaze_df(DATA_PATH),
             timezone=tz,
             prediction_stride=120,
-            n_jobs=4,
-            scene_camera_json=SCENE_CAMERA_JSON,
+            n_jobs=N_JOBS,
+            scene_camera_json=_load_scene_camera(SCENE_CAMERA_JSON),
         )
 
-        print(f"\nPredictions returned: {len(results)}")
-        print("  Expected: ~9 (20 min of data, every 120 sec, with warmup)")
+        print(f"\nPredictions returned: {len(results)}", file=out)
+        print("  Expected: ~9 (20 min of data, every 120 sec, with warmup)", file=out)
 
         if len(results) == 0:
-            print("  ERROR: No results returned")
+            print("  ERROR: No results returned", file=out)
             return False
 
         # Validate result structure
         first = results[0]
         required_keys = {"timestamp", "value", "label", "confidence"}
         if not required_keys.issubset(first.keys()):
-            print(f"  ERROR: Missing keys. Expected {required_keys}, got {set(first.keys())}")
+            print(f"  ERROR: Missing keys. Expected {required_keys}, got {set(first.keys())}", file=out)
             return False
 
-        if not (0 <= first["value"] <= 3):
-            print(f"  ERROR: value={first['value']} out of expected range 0-3")
+        columns = harmoneyes_theia.batch_results_to_arrays(results)
+        if not _check_range("value", columns["value"], 0, 3, out):
             return False
 
         # With stride=120, there are few enough predictions to display them all
-        print("\n  All predictions:")
+        print("\n  All predictions:", file=out)
         for r in results:
-            print(f"    t={r['timestamp']:6.1f}s  drowsiness={r['label']}")
+            print(f"    t={r['timestamp']:6.1f}s  drowsiness={r['label']}", file=out)
 
-        print("\nPASSED: predict_drowsiness_batch()")
+        print("\nPASSED: predict_drowsiness_batch()", file=out)
         return True
 
     except Exception as e:
-        print(f"\nFAILED: {e}")
+        print(f"\nFAILED: {e}", file=out)
         traceback.print_exc()
         return False
 
 
-def test_batch_api_with_dataframe() -> bool:
-    """Predict cognitive load from a pandas DataFrame (instead of a CSV path).
+def test_batch_api_with_dataframe(sdk: harmoneyes_theia.TheiaSDK, out: TextIO) -> bool:
+    """Predict cognitive load from a 50-second slice of the recording.
 
     The batch API accepts either a file path (str) or a pandas DataFrame.
-    This test loads the CSV into a DataFrame, takes a 50-second subset
-    (10,000 rows at 200 Hz), and passes it directly to the SDK.
+    All examples share one parsed DataFrame of the CSV; this test takes a
+    50-second subset (10,000 rows at 200 Hz) and passes it to the SDK.
     """
-    _print_header("Test 3: Cognitive Load Batch Prediction (DataFrame input)")
-
-    sdk = _create_sdk()
-    print("SDK initialized")
+    _print_header("Test 3: Cognitive Load Batch Prediction (DataFrame subset)", out)
 
     try:
-        print(f"\nLoading {DATA_PATH.name} into a DataFrame...")
-        df = pd.read_csv(DATA_PATH)
-        print(f"  Full dataset: {len(df):,} rows")
+        print(f"\nLoading {DATA_PATH.name} into a DataFrame...", file=out)
+        df = _load_gaze_df(DATA_PATH)
+        print(f"  Full dataset: {len(df):,} rows", file=out)
 
         # Use a small subset for faster execution
         df_subset = df.head(10_000)
-        print(f"  Using first 10,000 rows (50 seconds at 200 Hz)")
+        print(f"  Using first 10,000 rows (50 seconds at 200 Hz)", file=out)
 
-        print("\nRunning predict_cog_load_batch() with DataFrame input...")
+        print("\nRunning predict_cog_load_batch() with DataFrame input...", file=out)
         results = sdk.predict_cog_load_batch(
             data=df_subset,
-            n_jobs=4,
-            scene_camera_json=SCENE_CAMERA_JSON,
+            n_jobs=N_JOBS,
+            scene_camera_json=_load_scene_camera(SCENE_CAMERA_JSON),
         )
 
-        print(f"\nPredictions returned: {len(results)}")
-        print("  Expected: ~30 (50 seconds - 20 second warmup)")
+        print(f"\nPredictions returned: {len(results)}", file=out)
+        print("  Expected: ~30 (50 seconds - 20 second warmup)", file=out)
 
         if len(results) > 0:
-            print("\n  First 5 predictions:")
+            print("\n  First 5 predictions:", file=out)
             for r in results[:5]:
-                print(f"    t={r['timestamp']:6.1f}s  label={r['label']}  conf={r['confidence']:.3f}")
+                print(f"    t={r['timestamp']:6.1f}s  label={r['label']}  conf={r['confidence']:.3f}", file=out)
 
-        print("\nPASSED: predict_cog_load_batch() with DataFrame input")
+        print("\nPASSED: predict_cog_load_batch() with DataFrame subset", file=out)
         return True
 
     except Exception as e:
-        print(f"\nFAILED: {e}")
+        print(f"\nFAILED: {e}", file=out)
         traceback.print_exc()
         return False
 
 
+def _run_examples(
+    examples: list[tuple[str, Callable[[harmoneyes_theia.TheiaSDK, TextIO], bool]]],
+    sdk: harmoneyes_theia.TheiaSDK,
+) -> dict[str, tuple[bool, str]]:
+    """Run ``examples`` one after another on ``sdk``, capturing each report."""
+    outcomes = {}
+    for name, fn in examples:
+        report = io.StringIO()
+        outcomes[name] = fn(sdk, report), report.getvalue()
+    return outcomes
+
+
 def main() -> int:
     """Run all batch API examples and print a summary."""
     _print_header("Theia SDK — Batch API Examples")
     print(f"Data file:    {DATA_PATH}")
     print(f"Scene camera: {SCENE_CAMERA_JSON}")
-
-    results = {
-        "predict_cog_load_batch (CSV)":       test_predict_cog_load_batch(),
-        "predict_drowsiness_batch (CSV)":     test_predict_drowsiness_batch(),
-        "predict_cog_load_batch (DataFrame)": test_batch_api_with_dataframe(),
+    print(f"n_jobs:       {N_JOBS} per example")
+
+    # One SDK per model. The two cognitive load examples share an instance and
+    # run back-to-back on one worker; drowsiness runs alongside on its own.
+    cog_load_sdk = _create_sdk()
+    drowsiness_sdk = _create_sdk()
+    print("SDKs initialized")
+
+    tests = {
+        "predict_cog_load_batch (full)":     (test_predict_cog_load_batch, cog_load_sdk),
+        "predict_drowsiness_batch (full)":   (test_predict_drowsiness_batch, drowsiness_sdk),
+        "predict_cog_load_batch (subset)":   (test_batch_api_with_dataframe, cog_load_sdk),
     }
 
+    # The prediction work happens in each SDK's multiprocessing pool, so the
+    # two workers overlap while they wait on their pools. Each example writes
+    # its report to its own buffer, printed in the order listed above once
+    # that worker finishes; errors still go straight to stderr.
+    print("\nRunning examples; this may take a minute for 20 minutes of data...")
+    sys.stdout.flush()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            sdk: executor.submit(
+                _run_examples,
+                [(name, fn) for name, (fn, example_sdk) in tests.items() if example_sdk is sdk],
+                sdk,
+            )
+            for sdk in (cog_load_sdk, drowsiness_sdk)
+        }
+        results = {}
+        for name, (_, sdk) in tests.items():
+            results[name], report = futures[sdk].result()[name]
+            sys.stdout.write(report)
+            sys.stdout.flush()
+
     # Summary
     _print_header("Summary")
     passed = sum(results.values())
@@ -266,4 +391,8 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    # The SDK's batch pools are started from two threads at once. Forking a
+    # multithreaded process can copy a lock another thread holds (e.g.
+    # logging's), so start pool workers fresh as on macOS and Windows.
+    multiprocessing.set_start_method("spawn")
     sys.exit(main())
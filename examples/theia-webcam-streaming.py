@@ -120,13 +120,13 @@ def main():
     sdk.start_realtime_data()
 
     results = []
-    start_time = time.time()
+    start_time = time.monotonic()
 
     print(f"Collecting data for {COLLECTION_DURATION}s — Ctrl+C to stop early\n")
 
     try:
-        while (time.time() - start_time) < COLLECTION_DURATION:
-            elapsed = time.time() - start_time
+        while (time.monotonic() - start_time) < COLLECTION_DURATION:
+            elapsed = time.monotonic() - start_time
             row = {
                 "timestamp": datetime.now().isoformat(),
                 "elapsed_s": round(elapsed, 2),
@@ -0,0 +1,230 @@
+"""
+Streaming — HarmonEyes Theia SDK Example
+
+Connects to a Ganzin Sol or Pupil Labs Neon eye tracker, streams gaze data,
+and prints real-time mental workload and fatigue predictions as each batch
+window completes.
+
+The device-specific scripts (theia-ganzin-streaming.py and
+theia-pupil-labs-streaming.py) call main() from this module with their own
+configuration; it can also be run directly.
+
+Prerequisites:
+  1. Pass your license key with --license-key (or set LICENSE_KEY below).
+  2. Ensure the eye tracker is reachable:
+       Ganzin Sol:       on the network at the given --ip / --port
+       Pupil Labs Neon:  paired and discoverable
+
+Usage:
+  python theia_streaming.py --platform PL
+  python theia_streaming.py --platform Ganzin --ip 192.168.1.100 --port 8080
+  python theia_streaming.py --platform PL --duration 120
+"""
+
+import argparse
+import csv
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import harmoneyes_theia
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+LICENSE_KEY = "your-license-key-here"
+
+# Duration in seconds to collect data.
+# Drowsiness updates every ~120s, so 400s captures at least 3 updates.
+COLLECTION_DURATION = 400
+
+# SDK platform name -> prefix for the saved CSV file
+PLATFORMS = {
+    "Ganzin": "ganzin",    # Ganzin Sol
+    "PL": "pupil_labs",    # Pupil Labs Neon
+}
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+# Mental workload labels, indexed by the numeric prediction
+MW_LABELS = ("Low", "Moderate", "High")
+
+# Output directory for CSV files
+OUTPUT_DIR = "results"
+
+
+def format_mental_workload(prediction: int) -> str:
+    """Map a numeric mental workload prediction to a human-readable label."""
+    if 0 <= prediction < len(MW_LABELS):
+        return MW_LABELS[prediction]
+    return f"Unknown ({prediction})"
+
+
+def save_results_to_csv(results: list[dict], session_id: str, prefix: str) -> str:
+    """Save collected results to a CSV file and return the file path."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{prefix}_session_{timestamp}_{session_id[:8]}.csv"
+    filepath = os.path.join(OUTPUT_DIR, filename)
+
+    fieldnames = ["timestamp", "elapsed_s", "mental_workload", "mental_workload_label", "fatigue"]
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+    print(f"[TheiaSDK] Results saved to {filepath} ({len(results)} rows)")
+    return filepath
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main(
+    platform: str,
+    license_key: str = LICENSE_KEY,
+    ip: str | None = None,
+    port: int | None = None,
+    duration: float = COLLECTION_DURATION,
+) -> None:
+    """Stream from ``platform`` for ``duration`` seconds and save the results."""
+    if platform not in PLATFORMS:
+        raise ValueError(f"Unsupported platform: {platform}. Expected one of {sorted(PLATFORMS)}")
+
+    # Initialize the SDK for the selected eye tracker
+    sdk = harmoneyes_theia.TheiaSDK(
+        license_key=license_key,
+        platform=platform,
+    )
+    # Network address of the device (Ganzin Sol)
+    if ip is not None:
+        sdk.ip = ip
+    if port is not None:
+        sdk.port = port
+
+    session_id = str(uuid.uuid4())
+
+    batches: queue.Queue[dict] = queue.Queue()
+
+    # Resolve the bound methods once rather than on every batch / iteration
+    get_mental_workload_levels = sdk.get_mental_workload_levels
+    get_fatigue_level = sdk.get_fatigue_level
+    put_batch = batches.put
+    get_batch = batches.get
+    monotonic = time.monotonic
+
+    # The SDK invokes this from its processing thread each time a batch window
+    # completes. Capture both predictions immediately and hand them to the main
+    # thread, so output is driven by prediction arrival rather than a timer.
+    # Errors are swallowed here so they never escape into the SDK's thread and
+    # every batch still reaches the main loop.
+    def on_batch(batch_counter: int) -> None:
+        mw_levels = None
+        fatigue = None
+        try:
+            mw_levels, _, _ = get_mental_workload_levels()
+        except Exception:
+            pass  # SDK not ready yet (warmup period) or no prediction available
+        try:
+            fatigue, _ = get_fatigue_level()
+        except Exception:
+            pass  # SDK not ready yet (warmup period) or no prediction available
+        put_batch({
+            "batch": batch_counter,
+            "mental_workload": dict(mw_levels) if mw_levels else None,
+            "fatigue": fatigue,
+        })
+
+    sdk.set_sdk_row_callback(on_batch)
+
+    print(f"[TheiaSDK] Starting session {session_id}")
+    sdk.start_new_session(session_uuid=session_id)
+
+    print("[TheiaSDK] Starting data stream")
+    sdk.start_realtime_data()
+
+    results = []
+    start_time = monotonic()
+    try:
+        while (remaining := duration - (monotonic() - start_time)) > 0:
+            # Wait for the next batch in short slices so Ctrl+C is still
+            # delivered while no batches arrive (e.g. device unreachable)
+            try:
+                batch = get_batch(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+
+            elapsed = monotonic() - start_time
+            row = {
+                "timestamp": datetime.now().isoformat(),
+                "elapsed_s": round(elapsed, 2),
+                "mental_workload": None,
+                "mental_workload_label": None,
+                "fatigue": None,
+            }
+            # Lines for this batch, written to stdout in a single call below
+            pending = []
+
+            # Mental workload predictions (updates every 5-second window)
+            mw_levels = batch["mental_workload"]
+            if mw_levels is not None:
+                prediction = mw_levels["cog-load-general-smoothed"]["prediction"]
+                label = format_mental_workload(prediction)
+                row["mental_workload"] = prediction
+                row["mental_workload_label"] = label
+                pending.append(f"  Mental Workload: {label}")
+
+            # Fatigue predictions (updates every ~120 seconds)
+            fatigue = batch["fatigue"]
+            if fatigue is not None:
+                row["fatigue"] = fatigue
+                pending.append(f"  Fatigue: {fatigue}")
+
+            if pending:
+                sys.stdout.write("\n".join(pending) + "\n")
+                sys.stdout.flush()
+
+            results.append(row)
+    except KeyboardInterrupt:
+        print("\n[TheiaSDK] Interrupted by user")
+    finally:
+        print("[TheiaSDK] Stopping session")
+        sdk.stop_processing()
+        if results:
+            save_results_to_csv(results, session_id, PLATFORMS[platform])
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--platform", required=True, choices=sorted(PLATFORMS),
+                        help="Eye tracker: Ganzin (Ganzin Sol) or PL (Pupil Labs Neon)")
+    parser.add_argument("--ip", default=None,
+                        help="Device IP address (Ganzin Sol)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="Device port (Ganzin Sol)")
+    parser.add_argument("--duration", type=float, default=COLLECTION_DURATION,
+                        help=f"Seconds to collect data (default: {COLLECTION_DURATION})")
+    parser.add_argument("--license-key", default=LICENSE_KEY,
+                        help="HarmonEyes license key (default: LICENSE_KEY constant)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    main(
+        platform=args.platform,
+        license_key=args.license_key,
+        ip=args.ip,
+        port=args.port,
+        duration=args.duration,
+    )
@@ -2,17 +2,33 @@
 HarmonEyes Theia SDK - Platform-agnostic wrapper for compiled binaries.
 
 This package automatically detects your platform and loads the appropriate
-compiled binary for the Theia SDK.
+compiled binary for the Theia SDK. The binary is loaded lazily, the first
+time an SDK symbol such as ``TheiaSDK`` is accessed.
 """
 
 import os
 import stat
 import sys
-import platform
+import threading
 import importlib.util
 import importlib.machinery
-from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+# sys.platform values mapped to the platform.system() style names used below
+_SYSTEM_NAMES = {"linux": "Linux", "darwin": "Darwin", "win32": "Windows"}
+
+# Supported (system, machine) pairs and the binary each one loads
+_SUPPORTED_PLATFORMS = {
+    ("Linux", "x86_64"): ("linux-x86_64", "harmoneyes_theia-linux-x86_64.so"),
+    ("Linux", "AMD64"): ("linux-x86_64", "harmoneyes_theia-linux-x86_64.so"),
+    ("Darwin", "arm64"): ("macos-arm64", "harmoneyes_theia-macos-arm64.so"),
+    ("Windows", "x86_64"): ("windows-x86_64", "harmoneyes_theia-windows-x86_64.pyd"),
+    ("Windows", "AMD64"): ("windows-x86_64", "harmoneyes_theia-windows-x86_64.pyd"),
+}
 
 
 def _get_platform_info() -> tuple[str, str]:
@@ -25,41 +41,50 @@ def _get_platform_info() -> tuple[str, str]:
     Raises:
         RuntimeError: If the platform is not supported
     """
-    system = platform.system()
-    machine = platform.machine()
+    # sys.platform is a startup constant, so this avoids importing the
+    # platform module. On Windows, PROCESSOR_ARCHITECTURE describes the
+    # running interpreter (x86 under WOW64, AMD64, ARM64), which is what the
+    # binary has to match; elsewhere uname() reports the machine.
+    system = _SYSTEM_NAMES.get(sys.platform, sys.platform)
+    if system == "Windows":
+        machine = os.environ.get("PROCESSOR_ARCHITECTURE")
+        if not machine:
+            # Missing from a scrubbed environment - ask platform (WMI) instead
+            import platform
+
+            machine = platform.machine()
+    else:
+        machine = os.uname().machine
 
+    try:
+        return _SUPPORTED_PLATFORMS[(system, machine)]
+    except KeyError:
+        pass
+
+    # Unsupported combination - explain why
     if system == "Linux":
-        if machine in ("x86_64", "AMD64"):
-            return ("linux-x86_64", "harmoneyes_theia-linux-x86_64.so")
-        else:
-            raise RuntimeError(
-                f"Unsupported Linux architecture: {machine}. "
-                "Only x86_64 is supported."
-            )
+        raise RuntimeError(
+            f"Unsupported Linux architecture: {machine}. "
+            "Only x86_64 is supported."
+        )
 
     elif system == "Darwin":  # macOS
-        if machine == "arm64":
-            return ("macos-arm64", "harmoneyes_theia-macos-arm64.so")
-        elif machine == "x86_64":
+        if machine == "x86_64":
             # Intel Mac - you might want to add support for this
             raise RuntimeError(
                 "Intel Macs (x86_64) are not currently supported. "
                 "Only Apple Silicon (arm64) is supported."
             )
-        else:
-            raise RuntimeError(
-                f"Unsupported macOS architecture: {machine}. "
-                "Only arm64 is supported."
-            )
+        raise RuntimeError(
+            f"Unsupported macOS architecture: {machine}. "
+            "Only arm64 is supported."
+        )
 
     elif system == "Windows":
-        if machine in ("x86_64", "AMD64"):
-            return ("windows-x86_64", "harmoneyes_theia-windows-x86_64.pyd")
-        else:
-            raise RuntimeError(
-                f"Unsupported Windows architecture: {machine}. "
-                "Only x86_64 is supported."
-            )
+        raise RuntimeError(
+            f"Unsupported Windows architecture: {machine}. "
+            "Only x86_64 is supported."
+        )
 
     else:
         raise RuntimeError(
@@ -68,7 +93,7 @@ def _get_platform_info() -> tuple[str, str]:
         )
 
 
-def _load_binary_module(binary_path: Path) -> Any:
+def _load_binary_module(binary_path: str) -> Any:
     """
     Dynamically load the compiled binary module.
 
@@ -79,27 +104,26 @@ def _load_binary_module(binary_path: Path) -> Any:
         The loaded module
 
     Raises:
-        FileNotFoundError: If the binary file doesn't exist
-        ImportError: If the binary cannot be loaded
+        ImportError: If the binary is missing or cannot be loaded
     """
-    if not binary_path.exists():
-        raise FileNotFoundError(
-            f"Binary file not found: {binary_path}\n"
-            f"Expected location: {binary_path.absolute()}\n"
-            "Please ensure the correct binaries are installed."
-        )
+    # No separate existence check: the loader opens the file anyway and its
+    # error names the missing path, so a stat() here would only duplicate work
 
     # The Nuitka binary was compiled from 'harmoneyes_theia.py'
     # So it has PyInit_harmoneyes_theia as its init function
     # We MUST use this exact name when loading
     actual_module_name = "harmoneyes_theia"
-    internal_module_name = "_harmoneyes_theia_compiled"
+    # Registered as a submodule of this package rather than under an unrelated
+    # top-level name. There is no _compiled file for the import system to find,
+    # so it is only reachable (as harmoneyes_theia._compiled) once
+    # _ensure_loaded() has loaded the binary in this process.
+    internal_module_name = "harmoneyes_theia._compiled"
 
     # Create loader with the actual module name (must match PyInit function)
-    loader = importlib.machinery.ExtensionFileLoader(actual_module_name, str(binary_path))
+    loader = importlib.machinery.ExtensionFileLoader(actual_module_name, binary_path)
 
     # Create module manually without using spec_from_loader to avoid auto-registration
-    spec = importlib.machinery.ModuleSpec(actual_module_name, loader, origin=str(binary_path))
+    spec = importlib.machinery.ModuleSpec(actual_module_name, loader, origin=binary_path)
     module = importlib.util.module_from_spec(spec)
 
     # Register under our internal name BEFORE executing
@@ -112,54 +136,154 @@ def _load_binary_module(binary_path: Path) -> Any:
     return module
 
 
-# Detect platform and load the appropriate binary
+# Detect platform and locate the appropriate binary. Paths are kept as plain
+# strings on import; pathlib is only needed by get_webcam_binary_path().
 _platform_name, _binary_filename = _get_platform_info()
-_bin_dir = Path(__file__).parent / "_bin"
-_binary_path = _bin_dir / _binary_filename
+_bin_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_bin")
+_binary_path = os.path.join(_bin_dir, _binary_filename)
 
 # Resolve the platform-specific webcam sidecar binary
 _webcam_ext = ".exe" if _platform_name == "windows-x86_64" else ""
-_webcam_binary_path = _bin_dir / f"theia-webcam-{_platform_name}{_webcam_ext}"
+_webcam_binary_path = os.path.join(_bin_dir, f"theia-webcam-{_platform_name}{_webcam_ext}")
 
 # Ensure the webcam binary is executable (wheel extraction does not guarantee this)
-if _webcam_binary_path.exists() and _platform_name != "windows-x86_64":
-    _current_mode = _webcam_binary_path.stat().st_mode
-    _exec_bits = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
-    if not (_current_mode & _exec_bits):
+if _platform_name != "windows-x86_64":
+    try:
+        _current_mode = os.stat(_webcam_binary_path).st_mode
+    except OSError:
+        pass  # Not installed; get_webcam_binary_path() reports this
+    else:
+        _exec_bits = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+        if not (_current_mode & _exec_bits):
+            try:
+                os.chmod(_webcam_binary_path, _current_mode | _exec_bits)
+            except OSError:
+                pass
+
+_binary_module = None
+_binary_module_lock = threading.Lock()
+# Thread currently executing the binary's init, so imports it makes of its own
+# bundled modules do not re-enter _ensure_loaded()
+_loading_thread = None
+
+
+def _ensure_loaded() -> Any:
+    """
+    Load the compiled binary on first use and re-export its public symbols.
+
+    Returns:
+        The loaded binary module
+
+    Raises:
+        ImportError: If the binary cannot be loaded
+    """
+    global _binary_module, _loading_thread, __all__
+
+    if _binary_module is not None:
+        return _binary_module
+
+    with _binary_module_lock:
+        if _binary_module is not None:
+            return _binary_module
+
+        _loading_thread = threading.get_ident()
         try:
-            os.chmod(_webcam_binary_path, _current_mode | _exec_bits)
-        except OSError:
-            pass
-
-try:
-    _binary_module = _load_binary_module(_binary_path)
-except Exception as e:
-    raise ImportError(
-        f"Failed to load HarmonEyes Theia SDK binary for {_platform_name}.\n"
-        f"Error: {e}\n\n"
-        "Please ensure you have installed the package correctly and that "
-        "the compiled binaries are present in the _bin directory."
-    ) from e
-
-# The Nuitka binary inserts a nuitka_module_loader into sys.meta_path at
-# load time so it can serve bundled Python stubs from _bin/ (e.g.
-# theia_python.*). This inadvertently shadows real installed packages when
-# _bin/ contains an incomplete stub for the same name (e.g. av/__init__.py
-# without av._core). Moving all nuitka_module_loader entries to the end of
-# sys.meta_path ensures site-packages packages are found first while the
-# stubs remain reachable for anything only available in _bin/.
-_nuitka_loaders = [f for f in sys.meta_path if type(f).__name__ == "nuitka_module_loader"]
-for _loader in _nuitka_loaders:
-    sys.meta_path.remove(_loader)
-    sys.meta_path.append(_loader)
-
-
-# Re-export all public symbols from the binary module
-# This makes the API available as: from harmoneyes_theia import TheiaSDK
-__all__ = [name for name in dir(_binary_module) if not name.startswith("_")]
-
-for name in __all__:
-    globals()[name] = getattr(_binary_module, name)
+            module = _load_binary_module(_binary_path)
+        except Exception as e:
+            raise ImportError(
+                f"Failed to load HarmonEyes Theia SDK binary for {_platform_name}.\n"
+                f"Error: {e}\n\n"
+                "Please ensure you have installed the package correctly and that "
+                "the compiled binaries are present in the _bin directory."
+            ) from e
+        finally:
+            _loading_thread = None
+
+        # The Nuitka binary inserts a nuitka_module_loader into sys.meta_path at
+        # load time so it can serve bundled Python stubs from _bin/ (e.g.
+        # theia_python.*). This inadvertently shadows real installed packages when
+        # _bin/ contains an incomplete stub for the same name (e.g. av/__init__.py
+        # without av._core). Moving all nuitka_module_loader entries to the end of
+        # sys.meta_path ensures site-packages packages are found first while the
+        # stubs remain reachable for anything only available in _bin/.
+        nuitka_loaders = [f for f in sys.meta_path if type(f).__name__ == "nuitka_module_loader"]
+        for loader in nuitka_loaders:
+            sys.meta_path.remove(loader)
+            sys.meta_path.append(loader)
+
+        # The nuitka_module_loader now serves the bundled modules itself
+        if _bundled_module_finder in sys.meta_path:
+            sys.meta_path.remove(_bundled_module_finder)
+
+        # Re-export all public symbols from the binary module
+        # This makes the API available as: from harmoneyes_theia import TheiaSDK
+        # Names defined by this wrapper (e.g. get_platform_info) take precedence.
+        __all__ = [name for name in dir(module) if not name.startswith("_")]
+        for name in __all__:
+            globals().setdefault(name, getattr(module, name))
+
+        globals()["_compiled"] = module
+        _binary_module = module
+        return module
+
+
+class _BundledModuleFinder:
+    """
+    Load the binary before any of its bundled modules is imported.
+
+    The bundled ``theia_python.*`` modules are only importable through the
+    nuitka_module_loader that the binary installs when it loads. With lazy
+    loading, a spawned multiprocessing worker (the default start method on
+    macOS and Windows) re-imports this package without the binary and then
+    fails to unpickle batch worker functions such as
+    ``theia_python.core._process_single_window``. This finder loads the binary
+    on the first such import and then defers to the regular finders.
+    """
+
+    _BUNDLED_PACKAGES = frozenset({"theia_python"})
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None) -> None:
+        if (
+            fullname in self._BUNDLED_PACKAGES
+            and _loading_thread != threading.get_ident()
+        ):
+            _ensure_loaded()
+        return None
+
+
+_bundled_module_finder = _BundledModuleFinder()
+sys.meta_path.insert(0, _bundled_module_finder)
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve SDK symbols by loading the binary on first access (PEP 562)."""
+    if name == "__all__":
+        # A failed load stays an ImportError here; as an AttributeError,
+        # 'from harmoneyes_theia import *' would silently skip the SDK symbols
+        _ensure_loaded()
+        return __all__
+
+    if name.startswith("_"):
+        # Private and dunder names are probed by tooling (__path__, IPython's
+        # _repr_html_, getattr(mod, "_x", None), ...) and must not trigger a load
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        module = _ensure_loaded()
+    except ImportError as e:
+        # Keep hasattr() and getattr(..., default) working when the binary is
+        # unusable; the chained ImportError carries the details
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r} "
+            "(the SDK binary could not be loaded)"
+        ) from e
+    return getattr(module, name)
+
+
+def __dir__() -> list[str]:
+    """List the wrapper's names together with the binary's public symbols."""
+    _ensure_loaded()
+    return sorted(globals())
 
 
 # Add version and platform info
@@ -167,19 +291,22 @@ __version__ = "1.0.0"
 __platform__ = _platform_name
 
 
-def get_webcam_binary_path() -> Path:
+def get_webcam_binary_path() -> "Path":
     """
     Return the path to the platform-specific webcam sidecar binary.
 
     Raises:
         FileNotFoundError: If the webcam binary is not present in the installation
     """
-    if not _webcam_binary_path.exists():
+    from pathlib import Path
+
+    webcam_binary_path = Path(_webcam_binary_path)
+    if not webcam_binary_path.exists():
         raise FileNotFoundError(
-            f"Webcam sidecar binary not found: {_webcam_binary_path}\n"
+            f"Webcam sidecar binary not found: {webcam_binary_path}\n"
             "Please ensure the package was installed correctly."
         )
-    return _webcam_binary_path
+    return webcam_binary_path
 
 
 def get_platform_info() -> dict[str, str]:
@@ -191,7 +318,48 @@ def get_platform_info() -> dict[str, str]:
     """
     return {
         "platform": _platform_name,
-        "binary_path": str(_binary_path.absolute()),
+        "binary_path": _binary_path,
         "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
         "version": __version__,
     }
+
+
+# NumPy dtypes for the fields returned by the predict_*_batch methods
+_BATCH_FIELD_DTYPES = {
+    "timestamp": "float64",
+    "value": "int64",
+    "level": "int64",
+    "confidence": "float32",
+}
+
+
+def batch_results_to_arrays(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Convert batch prediction results into one NumPy array per field.
+
+    ``predict_cog_load_batch`` and ``predict_drowsiness_batch`` return one dict
+    per prediction. This turns that list into a structure of arrays, e.g.
+    ``{"timestamp": float64[n], "value": int64[n], "label": <U..[n],
+    "confidence": float32[n]}``, ready for vectorized analysis or plotting.
+
+    Args:
+        results: Prediction dicts as returned by a ``predict_*_batch`` method
+
+    Returns:
+        dict: Field name mapped to a 1-D array of length ``len(results)``
+              (empty if there are no results)
+    """
+    import numpy as np
+
+    if not results:
+        return {}
+
+    count = len(results)
+    arrays = {}
+    for field in results[0]:
+        dtype = _BATCH_FIELD_DTYPES.get(field)
+        if dtype is None:
+            arrays[field] = np.array([r[field] for r in results])
+        else:
+            arrays[field] = np.fromiter((r[field] for r in results), dtype=dtype, count=count)
+    return arrays